@@ -1,7 +1,9 @@
+import threading
+
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
 from config import HOSPITAL_CONFIG, EPS_CONFIG
-from main import rename_pdfs_with_prefix, split_pdfs, process_pdfs, combine_and_rename_pdfs
+from main import preload_dependencies, run_pipeline
 
 
 class PDFProcessorApp:
@@ -30,6 +32,9 @@ class PDFProcessorApp:
         self.create_widgets()
         self.configure_grid()
 
+        # Cargar las librerías pesadas mientras el usuario elige la carpeta
+        threading.Thread(target=preload_dependencies, daemon=True).start()
+
     def create_widgets(self):
         """Crear los widgets de la interfaz gráfica."""
 
@@ -80,9 +85,10 @@ class PDFProcessorApp:
         )
 
         # Botón para ejecutar las acciones seleccionadas
-        ctk.CTkButton(self.root, text="Ejecutar acciones seleccionadas", command=self.run_selected_actions).grid(
-            row=11, column=0, columnspan=2, pady=10
+        self.run_button = ctk.CTkButton(
+            self.root, text="Ejecutar acciones seleccionadas", command=self.run_selected_actions
         )
+        self.run_button.grid(row=11, column=0, columnspan=2, pady=10)
 
         # Salida de logs
         self.log_text = ctk.CTkTextbox(self.root, height=10, width=500)
@@ -104,7 +110,11 @@ class PDFProcessorApp:
             self.input_path.set(selected_path)
 
     def log_message(self, message):
-        """Muestra mensajes en el área de logs."""
+        """Muestra mensajes en el área de logs desde cualquier hilo."""
+        self.root.after(0, self._append_log, message)
+
+    def _append_log(self, message):
+        """Agrega un mensaje al área de logs. Solo debe llamarse desde el hilo principal."""
         self.log_text.configure(state="normal")
         self.log_text.insert("end", f"{message}\n")
         self.log_text.configure(state="disabled")
@@ -127,29 +137,46 @@ class PDFProcessorApp:
             messagebox.showerror("Error", "Por favor, selecciona un hospital.")
             return
 
+        # Leer las variables de Tk en el hilo principal antes de iniciar el trabajo
+        actions = {
+            "rename": self.rename_var.get(),
+            "split": self.split_var.get(),
+            "ocr": self.ocr_var.get(),
+            "combine": self.combine_var.get(),
+        }
+
+        # Ejecutar en segundo plano para que la ventana siga respondiendo
+        self.run_button.configure(state="disabled")
+        threading.Thread(
+            target=self._run_actions,
+            args=(input_path, EPS_CONFIG[eps_name], HOSPITAL_CONFIG[hospital_name], actions),
+            daemon=True,
+        ).start()
+
+    def _run_actions(self, input_path, eps_config, hospital_config, actions):
+        """Ejecuta el procesamiento en un hilo secundario y reporta el resultado al hilo principal."""
         try:
-            # Ejecutar las acciones en orden
-            if self.rename_var.get():
+            # Registrar las acciones en el orden en que se aplican a cada archivo
+            if actions["rename"]:
                 self.log_message("Renombrando PDFs con prefijo...")
-                rename_pdfs_with_prefix(input_path)
-
-            if self.split_var.get():
+            if actions["split"]:
                 self.log_message("Dividiendo PDFs por páginas...")
-                split_pdfs(input_path)
-
-            if self.ocr_var.get():
+            if actions["ocr"]:
                 self.log_message("Extrayendo texto o aplicando OCR...")
-                process_pdfs(input_path)
-
-            if self.combine_var.get():
+            if actions["combine"]:
                 self.log_message("Combinar y renombrar PDFs...")
-                combine_and_rename_pdfs(input_path, EPS_CONFIG[eps_name], HOSPITAL_CONFIG[hospital_name])
+
+            # Ejecutar todas las acciones en un solo recorrido de la carpeta
+            run_pipeline(input_path, eps_config, hospital_config, **actions)
 
             self.log_message("Todas las acciones seleccionadas se completaron exitosamente.")
 
         except Exception as e:
             self.log_message(f"Error: {e}")
-            messagebox.showerror("Error", f"Ha ocurrido un error: {e}")
+            self.root.after(0, messagebox.showerror, "Error", f"Ha ocurrido un error: {e}")
+
+        finally:
+            self.root.after(0, lambda: self.run_button.configure(state="normal"))
 
 
 if __name__ == "__main__":
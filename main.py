@@ -10,28 +10,62 @@ Usage:
 including file type mappings and filename formats.
 
 Dependencies:
-- PyPDF2: For PDF reading and writing.
+- pypdfium2: For fast text extraction through PDFium.
 - ocrmypdf: For Optical Character Recognition (OCR) processing.
+- pikepdf: For splitting and combining PDFs without re-serializing page content.
 - rapidfuzz: For string similarity matching.
 - unidecode: For normalizing text.
 - utils.log_utils: For setting up logging.
 
+The PDF, OCR and matching libraries are imported on first use so that importing this
+module (and opening the GUI) stays fast; `preload_dependencies` can warm them up ahead of time.
+
 """
 
+import hashlib
+import mmap
 import os
 import re
-from typing import Dict, List, Optional
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-import ocrmypdf
-from PyPDF2 import PdfReader, PdfWriter
-from PyPDF2.errors import PdfReadError
-from rapidfuzz import fuzz
-from unidecode import unidecode
+from utils.log_utils import get_log_queues, init_worker_logging, setup_logging
 
-from utils.log_utils import setup_logging
+if TYPE_CHECKING:
+    import pikepdf
 
 info_logger, error_logger = setup_logging()
 
+PAGE_SEPARATOR = "\f"
+
+# Text and OCR output of processed PDFs, keyed by content. Set PDF_INSIGHT_CACHE_DIR to move
+# it, or to an empty value to disable caching; entries are pruned after every run.
+CACHE_DIR = os.environ.get("PDF_INSIGHT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "pdf_insight"))
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 60 * 60
+
+TEMPORARY_PREFIX = "original_"
+
+# Tesseract jobs per OCR run; set per worker process by init_ocr_worker
+_ocr_jobs = 1
+
+# ProcessPoolExecutor cannot wait on more worker processes than this on Windows
+_MAX_WINDOWS_WORKERS = 61
+
+# Digests of the files hashed in this process, by path, modification time and size
+_file_digests = {}
+_MAX_FILE_DIGESTS = 256
+
+_INVOICE_NUMBER_RE = re.compile(r'\d+')
+_EXTRA_WHITESPACE_RE = re.compile(r'\s{2,}')
+_NON_ASCII_RE = re.compile(r'[^\x00-\x7f]+')
+
 
 def clean_path(path: str) -> str:
     """
@@ -56,7 +90,7 @@ def extract_invoice_number(folder_name: str) -> Optional[str]:
     Returns:
         Optional[str]: The extracted numeric invoice number or None if not found.
     """
-    match = re.search(r'\d+', folder_name)
+    match = _INVOICE_NUMBER_RE.search(folder_name)
     return match.group(0) if match else None
 
 
@@ -70,12 +104,103 @@ def clean_text(text: Optional[str]) -> str:
     Returns:
         str: The cleaned text.
     """
-    return re.sub(r'\s{2,}', ' ', text) if text else ""
+    return _EXTRA_WHITESPACE_RE.sub(' ', text) if text else ""
+
+
+@lru_cache(maxsize=4096)
+def transliterate(characters: str) -> str:
+    """
+    Transliterates non-ASCII characters to ASCII, caching the result.
+
+    Args:
+        characters (str): A run of non-ASCII characters.
+
+    Returns:
+        str: The ASCII transliteration.
+    """
+    from unidecode import unidecode
+
+    return unidecode(characters)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Transliterates text to ASCII and lowercases it for keyword matching.
+
+    unidecode maps text one character at a time in Python. Only the runs of non-ASCII
+    characters are sent through it here, and those repeat across pages and documents
+    (accented vowels, ñ), so almost all of them come from the cache.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text, equal to `unidecode(text).lower()`.
+    """
+    return _NON_ASCII_RE.sub(lambda match: transliterate(match.group()), text).lower()
+
+
+@dataclass(frozen=True)
+class EpsProfile:
+    """
+    EPS configuration prepared once per run for classification and naming.
+
+    Attributes:
+        file_types (Tuple): File type of each keyword, parallel to `keywords`.
+        keywords (Tuple[str, ...]): Transliterated, lowercased keywords in configuration order.
+        filename_format (str): Format string used to name combined files.
+    """
+    file_types: Tuple
+    keywords: Tuple[str, ...]
+    filename_format: str
+
+
+def normalize_eps_config(eps_config: Dict) -> EpsProfile:
+    """
+    Normalizes an EPS configuration so keywords are transliterated only once.
+
+    Args:
+        eps_config (Dict): Configuration dictionary containing file type mappings.
+
+    Returns:
+        EpsProfile: The normalized configuration.
+    """
+    pairs = [
+        (file_type, normalize_text(keyword))
+        for file_type, keyword_list in eps_config["TYPES"].items()
+        for keyword in keyword_list
+    ]
+    return EpsProfile(
+        file_types=tuple(file_type for file_type, _ in pairs),
+        keywords=tuple(keyword for _, keyword in pairs),
+        filename_format=eps_config["FILENAME_FORMAT"],
+    )
+
+
+def read_page_text(page) -> str:
+    """
+    Reads the text of a PDFium page and releases the page right away.
+
+    Closing each page as soon as it is read keeps memory flat on long documents,
+    instead of holding every parsed page until the document is closed.
+
+    Args:
+        page (pypdfium2.PdfPage): The page to read.
+
+    Returns:
+        str: The text of the page.
+    """
+    textpage = page.get_textpage()
+    try:
+        return textpage.get_text_bounded()
+    finally:
+        textpage.close()
+        page.close()
 
 
 def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
     """
-    Extracts text from a PDF using PyPDF2.
+    Extracts text from a PDF using PDFium, separating pages with a form feed.
 
     Args:
         pdf_path (str): Path to the PDF file.
@@ -83,33 +208,418 @@ def extract_text_from_pdf(pdf_path: str) -> Optional[str]:
     Returns:
         Optional[str]: Extracted text from the PDF or None if extraction fails.
     """
+    import pypdfium2 as pdfium
+
     try:
-        with open(pdf_path, "rb") as file:
-            reader = PdfReader(file)
-            return "".join(page.extract_text() or "" for page in reader.pages)
-    except PdfReadError as e:
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return PAGE_SEPARATOR.join(read_page_text(page) for page in pdf)
+        finally:
+            pdf.close()
+    except pdfium.PdfiumError as e:
         error_logger.error(f"Error reading PDF {pdf_path}: {e}")
     except Exception as e:
         error_logger.error(f"Unexpected error extracting text from {pdf_path}: {e}")
     return None
 
 
-def apply_ocr(pdf_path: str) -> None:
+def get_text_sidecar_path(pdf_path: str) -> str:
     """
-    Applies OCR to a PDF and returns the path to the searchable PDF.
+    Returns the path of the text sidecar that caches a PDF's extracted text.
 
     Args:
         pdf_path (str): Path to the PDF file.
 
+    Returns:
+        str: Path to the sidecar text file.
+    """
+    return f"{pdf_path}.txt"
+
+
+def _get_digest_key(file_path: str) -> Tuple[str, int, int]:
+    """
+    Returns the key of a file's digest. Keyed by modification time and size so edits invalidate it.
+    """
+    stat = os.stat(file_path)
+    return file_path, stat.st_mtime_ns, stat.st_size
+
+
+def compute_file_digest(file_path: str) -> str:
+    """
+    Returns the SHA-256 digest of a file's contents, hashing each version of the file only once.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    key = _get_digest_key(file_path)
+    if key in _file_digests:
+        return _file_digests[key]
+
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        # Empty files cannot be mapped, and their digest is that of no data
+        if key[2]:
+            # Hash the mapped file so large scans are not copied into Python memory first
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                digest.update(mapped_file)
+
+    if len(_file_digests) >= _MAX_FILE_DIGESTS:
+        _file_digests.clear()
+    _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def peek_file_digest(file_path: str) -> Optional[str]:
+    """
+    Returns the digest of a file if it was already hashed in this process, without reading the file.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        Optional[str]: The hexadecimal digest, or None if the file has not been hashed.
+    """
+    try:
+        return _file_digests.get(_get_digest_key(file_path))
+    except OSError:
+        return None
+
+
+def get_cache_path(digest: str, extension: str) -> str:
+    """
+    Returns the path of a cache entry for content with the given digest.
+
+    Args:
+        digest (str): Digest of the source file's contents.
+        extension (str): Extension of the cached artifact, e.g. ".txt" or ".pdf".
+
+    Returns:
+        str: Path to the cache entry inside CACHE_DIR.
+    """
+    return os.path.join(CACHE_DIR, f"{digest}{extension}")
+
+
+def save_to_cache(source_path: str, cache_path: str) -> None:
+    """
+    Copies a file into the cache. The copy is renamed into place so that concurrent
+    workers never read a partial entry.
+
+    Args:
+        source_path (str): Path to the file to cache.
+        cache_path (str): Path of the cache entry.
+
     Returns:
         None
     """
+    if not CACHE_DIR:
+        return
+
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        error_logger.error(f"Error saving {source_path} to cache: {e}")
+
+
+def read_text_sidecar(pdf_path: str) -> Optional[str]:
+    """
+    Reads the cached text of a PDF if its sidecar is at least as recent as the PDF.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        Optional[str]: The cached text, or None if there is no fresh sidecar.
+    """
+    sidecar_path = get_text_sidecar_path(pdf_path)
+    try:
+        if os.path.getmtime(sidecar_path) >= os.path.getmtime(pdf_path):
+            with open(sidecar_path, "r", encoding="utf-8") as sidecar:
+                return sidecar.read()
+    except OSError:
+        pass
+    return None
+
+
+def read_cached_text(pdf_path: str, hash_file: bool = True) -> Optional[str]:
+    """
+    Reads the cached text of a PDF from its sidecar, or from the content cache if the
+    same file was processed before under any name.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        hash_file (bool): Whether to hash the PDF to look it up in the content cache. If False,
+            the content cache is only checked when the PDF was already hashed in this process.
+
+    Returns:
+        Optional[str]: The cached text, or None if the PDF has not been read before.
+    """
+    text = read_text_sidecar(pdf_path)
+    if text is not None or not CACHE_DIR:
+        return text
+
+    try:
+        digest = compute_file_digest(pdf_path) if hash_file else peek_file_digest(pdf_path)
+        if digest is None:
+            return None
+        cache_path = get_cache_path(digest, ".txt")
+        with open(cache_path, "r", encoding="utf-8") as cached:
+            text = cached.read()
+        # Recently used entries are the last to be pruned
+        os.utime(cache_path)
+        return text
+    except OSError:
+        return None
+
+
+def save_text_to_cache(pdf_path: str, text: str) -> None:
+    """
+    Caches the text of a PDF in CACHE_DIR only, keyed by the PDF's contents. The entry is
+    renamed into place so that concurrent workers never read a partial entry.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        text (str): The text of the PDF, with pages separated by PAGE_SEPARATOR.
+
+    Returns:
+        None
+    """
+    if not CACHE_DIR:
+        return
+
+    try:
+        cache_path = get_cache_path(compute_file_digest(pdf_path), ".txt")
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temp_path, "w", encoding="utf-8") as cached:
+            cached.write(text)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        error_logger.error(f"Error caching text of {pdf_path}: {e}")
+
+
+def cache_text(pdf_path: str, text: str) -> None:
+    """
+    Caches the text of a PDF in a sidecar next to it and in CACHE_DIR, keyed by the
+    PDF's contents, so it survives renames and later runs.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        text (str): The text of the PDF, with pages separated by PAGE_SEPARATOR.
+
+    Returns:
+        None
+    """
+    try:
+        with open(get_text_sidecar_path(pdf_path), "w", encoding="utf-8") as sidecar:
+            sidecar.write(text)
+    except OSError as e:
+        error_logger.error(f"Error caching text of {pdf_path}: {e}")
+    save_text_to_cache(pdf_path, text)
+
+
+def prune_cache(max_bytes: int = CACHE_MAX_BYTES, max_age: float = CACHE_MAX_AGE) -> None:
+    """
+    Removes cache entries older than `max_age`, then the least recently used entries until
+    the cache fits in `max_bytes`.
+
+    Args:
+        max_bytes (int): Maximum total size of the cache, in bytes.
+        max_age (float): Maximum time since an entry was last used, in seconds.
+
+    Returns:
+        None
+    """
+    if not CACHE_DIR or not os.path.isdir(CACHE_DIR):
+        return
+
+    try:
+        with os.scandir(CACHE_DIR) as entries:
+            cache_entries = [(entry.path, entry.stat()) for entry in entries if entry.is_file()]
+    except OSError as e:
+        error_logger.error(f"Error reading cache {CACHE_DIR}: {e}")
+        return
+
+    # Most recently used first; everything past the size or age limit is removed
+    cache_entries.sort(key=lambda cache_entry: cache_entry[1].st_mtime, reverse=True)
+    oldest_mtime = time.time() - max_age
+    total_bytes = 0
+    for cache_path, stat in cache_entries:
+        total_bytes += stat.st_size
+        if total_bytes <= max_bytes and stat.st_mtime >= oldest_mtime:
+            continue
+        try:
+            os.remove(cache_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            error_logger.error(f"Error removing cache entry {cache_path}: {e}")
+
+
+def clear_cache() -> None:
+    """
+    Removes every cache entry.
+
+    Returns:
+        None
+    """
+    if CACHE_DIR:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+
+def get_or_extract_text(pdf_path: str) -> Optional[str]:
+    """
+    Returns the cached text of a PDF, extracting and caching it if it has not been read before.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        Optional[str]: Extracted text from the PDF or None if extraction fails.
+    """
+    text = read_cached_text(pdf_path)
+    if text is not None:
+        return text
+
+    text = extract_text_from_pdf(pdf_path)
+    # Scans without a text layer are not cached, so the text read after OCR is not shadowed
+    if text and text.strip():
+        cache_text(pdf_path, text)
+    return text
+
+
+def iter_pdf_text(pdf_path: str) -> Iterator[str]:
+    """
+    Yields the text of a PDF page by page, so callers can stop reading as soon as they are done.
+
+    Cached text is read instead of parsing the PDF when available. The PDF is not hashed
+    to look it up, since that would read the whole file before the first page.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        Iterator[str]: The text of each page.
+    """
+    cached_text = read_cached_text(pdf_path, hash_file=False)
+    if cached_text is not None:
+        yield from cached_text.split(PAGE_SEPARATOR)
+        return
+
+    import pypdfium2 as pdfium
+
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
+    except pdfium.PdfiumError as e:
+        error_logger.error(f"Error reading PDF {pdf_path}: {e}")
+        return
+    except Exception as e:
+        error_logger.error(f"Unexpected error extracting text from {pdf_path}: {e}")
+        return
+
+    try:
+        for page in pdf:
+            yield read_page_text(page)
+    finally:
+        pdf.close()
+
+
+def remove_text_sidecar(pdf_path: str) -> None:
+    """
+    Removes the text sidecar of a PDF, if any.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        None
+    """
+    try:
+        os.remove(get_text_sidecar_path(pdf_path))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        error_logger.error(f"Error removing text sidecar of {pdf_path}: {e}")
+
+
+def apply_ocr(pdf_path: str, force_ocr: bool = False) -> Optional[str]:
+    """
+    Applies OCR to a PDF and returns the path to the searchable PDF.
+
+    OCR output is cached in CACHE_DIR keyed by the input's contents, so the same scan is
+    only OCR'd once across runs. The text recognized by OCR is cached as well, so the
+    searchable PDF does not have to be parsed again to classify it.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        force_ocr (bool): Whether to OCR every page, replacing any text it has. By default,
+            pages that already have text are kept as they are.
+
+    Returns:
+        Optional[str]: Path to the searchable PDF, or None if OCR fails.
+    """
+    import ocrmypdf
+
     try:
         output_path = f"{os.path.splitext(pdf_path)[0]}_searchable.pdf"
-        ocrmypdf.ocr(pdf_path, output_path, deskew=True)
+        extension = ".forced.pdf" if force_ocr else ".pdf"
+        cache_path = get_cache_path(compute_file_digest(pdf_path), extension) if CACHE_DIR else None
+
+        if cache_path and os.path.exists(cache_path):
+            shutil.copyfile(cache_path, output_path)
+            os.utime(cache_path)
+            # Hashing the copy now lets classification find its cached text without rereading it
+            compute_file_digest(output_path)
+            info_logger.info(f"Reused cached OCR output for {pdf_path}")
+        else:
+            # Unless forced, pages that already have text are kept as they are. The output is
+            # only read and recombined by this tool, so PDF/A conversion, optimization and
+            # linearization (disabled through a threshold no file reaches) are skipped.
+            text_path = f"{os.path.splitext(pdf_path)[0]}_ocr.txt"
+            ocrmypdf.ocr(pdf_path, output_path, deskew=True, force_ocr=force_ocr, skip_text=not force_ocr,
+                         output_type="pdf", optimize=0, fast_web_view=10_000, jobs=_ocr_jobs,
+                         use_threads=True, progress_bar=False, sidecar=text_path)
+            if cache_path:
+                save_to_cache(output_path, cache_path)
+
+            with open(text_path, "r", encoding="utf-8") as ocr_text:
+                text = ocr_text.read()
+            os.remove(text_path)
+            # Skipped pages are collapsed into a placeholder, so the text no longer lines up
+            # with the pages; it is extracted from the searchable PDF instead. Only the content
+            # cache is written, so no sidecar is left next to the searchable PDF.
+            if text.strip() and "[OCR skipped on page" not in text:
+                save_text_to_cache(output_path, text)
+
         os.remove(pdf_path)
+        remove_text_sidecar(pdf_path)
+        return output_path
     except Exception as e:
         error_logger.error(f"Error applying OCR to {pdf_path}: {e}")
+    return None
+
+
+def open_pdf(pdf_path: str) -> "pikepdf.Pdf":
+    """
+    Opens a PDF with pikepdf, memory-mapping the file when the platform allows it.
+
+    Mapping lets the kernel page the file in on demand instead of copying it
+    through userspace read buffers.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        pikepdf.Pdf: The opened PDF. Callers must close it.
+    """
+    import pikepdf
+
+    return pikepdf.open(pdf_path, access_mode=pikepdf.AccessMode.mmap)
 
 
 def split_pdf_by_page(pdf_path: str) -> List[str]:
@@ -122,23 +632,25 @@ def split_pdf_by_page(pdf_path: str) -> List[str]:
     Returns:
         list: A list of paths to the individual page PDFs, or the original file if it's a single-page PDF.
     """
+    import pikepdf
+
     page_paths = []
     try:
-        with open(pdf_path, "rb") as file:
-            reader = PdfReader(file)
+        with open_pdf(pdf_path) as source:
 
             # If the PDF has only one page, return an empty list (indicating no splitting needed)
-            if len(reader.pages) == 1:
+            if len(source.pages) == 1:
                 info_logger.info(f"Skipping splitting for single-page PDF: {pdf_path}")
                 return [pdf_path]  # Return the original file in the list without splitting
 
-            # If the PDF has more than one page, proceed to split
-            for i, page in enumerate(reader.pages):
-                page_pdf_path = f"{os.path.splitext(pdf_path)[0]}_page_{i + 1}.pdf"
-                writer = PdfWriter()
-                writer.add_page(page)
-                with open(page_pdf_path, "wb") as output_file:
-                    writer.write(output_file)
+            # If the PDF has more than one page, proceed to split. Pages are copied by
+            # reference, so their content streams are never decoded or re-encoded.
+            base_path = os.path.splitext(pdf_path)[0]
+            for i, page in enumerate(source.pages):
+                page_pdf_path = f"{base_path}_page_{i + 1}.pdf"
+                with pikepdf.Pdf.new() as page_pdf:
+                    page_pdf.pages.append(page)
+                    page_pdf.save(page_pdf_path, object_stream_mode=pikepdf.ObjectStreamMode.generate)
                 page_paths.append(page_pdf_path)
         return page_paths
     except Exception as e:
@@ -146,108 +658,209 @@ def split_pdf_by_page(pdf_path: str) -> List[str]:
         return []  # Return an empty list if there is an error
 
 
-def combine_pdfs(pdf_paths: List[str], output_path: str) -> None:
+def combine_pdfs(pdf_pages: List[Tuple[str, Optional[int]]], output_path: str) -> bool:
     """
-    Combines multiple PDFs into a single PDF file.
+    Combines pages of multiple PDFs into a single PDF file.
 
     Args:
-        pdf_paths (List[str]): List of paths to PDF files.
+        pdf_pages (List[Tuple[str, Optional[int]]]): Paths to PDF files, each paired with the
+            index of the page to take, or with None to take every page.
         output_path (str): Path to the output combined PDF file.
 
     Returns:
-        None
+        bool: True if the combined PDF was saved, False otherwise.
     """
+    import pikepdf
+
     try:
-        writer = PdfWriter()
-        for pdf_path in pdf_paths:
-            with open(pdf_path, "rb") as file:
-                reader = PdfReader(file)
-                for page in reader.pages:
-                    writer.add_page(page)
-        with open(output_path, "wb") as output_file:
-            writer.write(output_file)
+        # Source PDFs stay open until the combined PDF is saved, since pikepdf reads
+        # the grafted page streams from them lazily
+        with ExitStack() as stack:
+            combined_pdf = stack.enter_context(pikepdf.Pdf.new())
+            sources = {}
+            for pdf_path, page_index in pdf_pages:
+                if pdf_path not in sources:
+                    sources[pdf_path] = stack.enter_context(open_pdf(pdf_path))
+                source = sources[pdf_path]
+                if page_index is None:
+                    combined_pdf.pages.extend(source.pages)
+                else:
+                    combined_pdf.pages.append(source.pages[page_index])
+            combined_pdf.save(
+                output_path,
+                compress_streams=True,
+                object_stream_mode=pikepdf.ObjectStreamMode.generate,
+                linearize=False,
+            )
         info_logger.info(f"Combined PDFs into {output_path}")
-
-        # Remove original files after combining
-        for pdf_path in pdf_paths:
-            os.remove(pdf_path)
+        return True
 
     except Exception as e:
-        error_logger.error(f"Error combining PDFs {pdf_paths}: {e}")
+        error_logger.error(f"Error combining PDFs {pdf_pages}: {e}")
+    return False
+
+
+def find_exact_keyword(normalized_text: str, eps_profile: EpsProfile, limit: Optional[int] = None) -> Optional[int]:
+    """
+    Returns the index of the first keyword, in configuration order, contained in the text.
+
+    Args:
+        normalized_text (str): Transliterated, lowercased text to search.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
+        limit (Optional[int]): Only search keywords ranked before this index. Defaults to all.
+
+    Returns:
+        Optional[int]: Index of the matched keyword or None if no keyword is present.
+    """
+    for index, normalized_keyword in enumerate(eps_profile.keywords[:limit]):
+        if normalized_keyword in normalized_text:
+            return index
+    return None
+
+
+def match_exact_keyword(normalized_text: str, eps_profile: EpsProfile) -> Optional[str]:
+    """
+    Returns the file type of the first keyword, in configuration order, contained in the text.
+
+    Args:
+        normalized_text (str): Transliterated, lowercased text to search.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
+
+    Returns:
+        Optional[str]: The matched file type or None if no keyword is present.
+    """
+    index = find_exact_keyword(normalized_text, eps_profile)
+    return eps_profile.file_types[index] if index is not None else None
 
 
-def determine_file_type(text: str, keywords: Dict[str, List[str]], similarity_threshold: int = 80) -> Optional[str]:
+def match_fuzzy_keyword(normalized_text: str, eps_profile: EpsProfile, similarity_threshold: int = 80) -> Optional[str]:
+    """
+    Returns the file type of the keyword most similar to the text, if it reaches the threshold.
+
+    Args:
+        normalized_text (str): Transliterated, lowercased text to search.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
+        similarity_threshold (int): The threshold for similarity between text and keywords.
+
+    Returns:
+        Optional[str]: The best matching file type or None if no keyword is similar enough.
+    """
+    from rapidfuzz import fuzz, process
+
+    # Compara la similitud de todas las palabras clave en una sola llamada de RapidFuzz;
+    # ante un empate se conserva la primera en el orden de configuración
+    best_match = process.extractOne(
+        normalized_text, eps_profile.keywords, scorer=fuzz.partial_ratio, score_cutoff=similarity_threshold
+    )
+    return eps_profile.file_types[best_match[2]] if best_match else None
+
+
+def determine_file_type(text: str, eps_profile: EpsProfile, similarity_threshold: int = 80) -> Optional[str]:
     """
     Determines the file type based on keywords and fuzzy matching, selecting the most relevant one.
 
     Args:
         text (str): The text to analyze for file type determination.
-        keywords (Dict[str, List[str]]): Dictionary mapping file types to associated keywords.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
         similarity_threshold (int): The threshold for similarity between text and keywords.
 
     Returns:
         Optional[str]: The determined file type or None if no match is found.
     """
 
-    normalized_text = unidecode(text).lower()
-    best_match_file_type = None
-    highest_similarity = 0  # Almacenará la mejor coincidencia encontrada
-
-    for file_type, keyword_list in keywords.items():
-        for keyword in keyword_list:
-            normalized_keyword = unidecode(keyword).lower()
+    normalized_text = normalize_text(text)
 
-            # Comprueba si el keyword está en el texto
-            if normalized_keyword in normalized_text:
-                return file_type  # Si la palabra clave exacta se encuentra, se retorna inmediatamente
+    # Busca primero coincidencias exactas de todas las palabras clave; la similitud
+    # difusa solo se calcula si ninguna aparece en el texto. Se compara siempre con el
+    # texto normalizado para que "HISTORIA ELECTRÓNICA" cuente como "HISTORIA ELECTRONICA"
+    # y gane la primera palabra clave según el orden de la configuración
+    file_type = match_exact_keyword(normalized_text, eps_profile)
+    if file_type is not None:
+        return file_type  # Si la palabra clave exacta se encuentra, se retorna inmediatamente
 
-            # Compara la similitud con el umbral
-            similarity = fuzz.partial_ratio(normalized_text, normalized_keyword)
-            if similarity >= similarity_threshold and similarity > highest_similarity:
-                best_match_file_type = file_type
-                highest_similarity = similarity
+    return match_fuzzy_keyword(normalized_text, eps_profile, similarity_threshold)
 
-    return best_match_file_type
 
-
-def generate_new_filename(invoice: str, file_type: str, eps_config: Dict, hospital_config: Dict) -> str:
+def generate_new_filename(invoice: str, file_type: str, eps_profile: EpsProfile, hospital_config: Dict) -> str:
     """
     Generates a new filename based on EPS configuration.
 
     Args:
         invoice (str): Invoice number.
         file_type (str): The type of file.
-        eps_config (Dict): Configuration dictionary for file naming.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the filename format.
         hospital_config (Dict): Hospital configuration with NIT and optional prefix.
 
     Returns:
         str: The newly generated filename.
     """
-    return eps_config["FILENAME_FORMAT"].format(
-        file_type=file_type,
-        NIT=hospital_config["NIT"],
-        PREFIX=hospital_config.get("PREFIX", ""),
-        invoice=invoice
-    )
+    return eps_profile.filename_format.format_map({
+        "file_type": file_type,
+        "NIT": hospital_config["NIT"],
+        "PREFIX": hospital_config.get("PREFIX", ""),
+        "invoice": invoice,
+    })
 
 
-def extract_text_or_apply_ocr(pdf_path: str) -> None:
+def has_text_layer(pdf_path: str, min_chars: int = 50) -> bool:
     """
-    Tries to extract text from PDF, applies OCR if text is not found.
+    Checks whether a PDF already has a usable text layer.
+
+    Pages are read one at a time and reading stops as soon as enough text was found,
+    so native-text PDFs are usually decided from their first page. When every page had
+    to be read, the text is cached so it is not extracted again.
 
     Args:
         pdf_path (str): Path to the PDF file.
+        min_chars (int): Minimum amount of text, ignoring surrounding whitespace, for the
+            text layer to count as usable. Stray characters, such as a scanner footer, do not.
 
     Returns:
-        None
+        bool: True if the PDF has at least `min_chars` characters of text, False if it has
+        less or cannot be read.
     """
-    text = extract_text_from_pdf(pdf_path)
-    if not text:
-        apply_ocr(pdf_path)
-        info_logger.info(f"OCR applied")
+    page_texts = []
+    text_length = 0
+    try:
+        for page_text in iter_pdf_text(pdf_path):
+            text_length += len(page_text.strip())
+            if text_length >= min_chars:
+                return True
+            page_texts.append(page_text)
+    except Exception as e:
+        error_logger.error(f"Unexpected error extracting text from {pdf_path}: {e}")
+        return False
+
+    # Only a complete read is cached, so later readers never mistake it for the whole text
+    text = PAGE_SEPARATOR.join(page_texts)
+    if text.strip():
+        cache_text(pdf_path, text)
+    return False
+
+
+def extract_text_or_apply_ocr(pdf_path: str) -> str:
+    """
+    Checks whether the PDF has a text layer, applies OCR if it does not.
+
+    The check stops reading as soon as enough text was found, so native-text PDFs are
+    usually decided from their first page without parsing the rest of the document.
 
+    Args:
+        pdf_path (str): Path to the PDF file.
 
-def handle_pdf_splitting(pdf_path: str) -> None:
+    Returns:
+        str: Path to the searchable PDF, which is the original path unless OCR replaced it.
+    """
+    if not has_text_layer(pdf_path):
+        # Pages with only stray text would be skipped by ocrmypdf, so every page is OCR'd
+        searchable_path = apply_ocr(pdf_path, force_ocr=True)
+        if searchable_path:
+            info_logger.info(f"OCR applied")
+            return searchable_path
+    return pdf_path
+
+
+def handle_pdf_splitting(pdf_path: str) -> List[str]:
     """
     Splits the PDF into individual pages and removes the original if necessary.
 
@@ -255,40 +868,42 @@ def handle_pdf_splitting(pdf_path: str) -> None:
         pdf_path (str): Path to the original PDF file.
 
     Returns:
-        None
+        List[str]: Paths to the individual page PDFs, or the original file if it was not split.
     """
     page_paths = split_pdf_by_page(pdf_path)
 
     if not page_paths:
         error_logger.error(f"Failed to split {pdf_path}. Skipping.")
-        return
+        return [pdf_path]
 
     if len(page_paths) > 1:
         try:
             os.remove(pdf_path)
+            remove_text_sidecar(pdf_path)
             info_logger.info(f"Deleted original file after splitting: {pdf_path}")
         except Exception as e:
             error_logger.error(f"Error deleting original file {pdf_path}: {e}")
-    return
+    return page_paths
 
 
-def process_text_for_file_type(text: str, eps_config: Dict) -> Optional[str]:
+def process_text_for_file_type(text: str, eps_profile: EpsProfile) -> Optional[str]:
     """
     Cleans text and determines the file type based on keywords.
 
     Args:
         text (str): The text to analyze.
-        eps_config (Dict): Configuration dictionary containing file type mappings.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
 
     Returns:
         Optional[str]: The determined file type, or None if no match is found.
     """
     cleaned_text = clean_text(text)
-    file_type = determine_file_type(cleaned_text, eps_config["TYPES"])
+    file_type = determine_file_type(cleaned_text, eps_profile)
     return file_type
 
 
-def generate_new_file_path(pdf_path: str, file_type: str, invoice: str, eps_config: Dict, hospital_config: Dict) -> str:
+def generate_new_file_path(pdf_path: str, file_type: str, invoice: str, eps_profile: EpsProfile,
+                           hospital_config: Dict) -> str:
     """
     Generates the new file path with the new filename.
 
@@ -296,78 +911,222 @@ def generate_new_file_path(pdf_path: str, file_type: str, invoice: str, eps_conf
         pdf_path (str): Path to the original PDF file.
         file_type (str): Type of the file.
         invoice (str): Invoice number.
-        eps_config (Dict): Configuration dictionary containing file type mappings.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the filename format.
         hospital_config (Dict): Hospital-specific configuration.
 
     Returns:
         str: The new file path.
     """
-    new_filename = generate_new_filename(invoice, file_type, eps_config, hospital_config)
+    new_filename = generate_new_filename(invoice, file_type, eps_profile, hospital_config)
     new_pdf_path = os.path.join(os.path.dirname(pdf_path), new_filename)
     return new_pdf_path
 
 
+def scan_pdf_files(input_path: str) -> Iterator[os.DirEntry]:
+    """
+    Recursively yields the directory entries of all PDFs under a directory.
+
+    Unlike os.walk, os.scandir exposes each entry's file type from the directory
+    listing itself, so no extra stat call is needed per file.
+
+    Args:
+        input_path (str): Path to the directory containing PDFs.
+
+    Returns:
+        Iterator[os.DirEntry]: Entries of the PDFs found in the directory tree.
+    """
+    with os.scandir(input_path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from scan_pdf_files(entry.path)
+            elif entry.is_file() and entry.name.endswith('.pdf'):
+                yield entry
+
+
+def add_temporary_prefix(pdf_path: str) -> str:
+    """
+    Adds a temporary prefix to a PDF's filename, unless it already has it.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+
+    Returns:
+        str: Path to the renamed PDF, or the original path if it was not renamed.
+    """
+    root, file = os.path.split(pdf_path)
+    if file.startswith(TEMPORARY_PREFIX):
+        return pdf_path
+
+    temp_pdf_path = os.path.join(root, f"{TEMPORARY_PREFIX}{file}")
+    try:
+        os.rename(pdf_path, temp_pdf_path)
+    except Exception as e:
+        error_logger.error(f"Error adding temporary prefix to {pdf_path}: {e}")
+        return pdf_path
+
+    # Keep the cached text with its PDF so it is neither orphaned nor read back stale
+    try:
+        os.rename(get_text_sidecar_path(pdf_path), get_text_sidecar_path(temp_pdf_path))
+    except FileNotFoundError:
+        pass
+    except OSError:
+        remove_text_sidecar(pdf_path)
+    return temp_pdf_path
+
+
 def rename_pdfs_with_prefix(input_path: str) -> None:
     """
     Adds a temporary prefix to all PDFs in the directory.
 
+    Renames are issued from a thread pool, so their latency overlaps on slow or
+    network file systems.
+
     Args:
         input_path (str): Path to the directory containing PDFs.
 
     Returns:
         None
     """
-    for root, _, files in os.walk(input_path):
-        for file in files:
-            if file.endswith('.pdf'):
-                pdf_path = os.path.join(root, file)
-                temp_pdf_path = os.path.join(root, f"original_{file}")
-                try:
-                    os.rename(pdf_path, temp_pdf_path)
-                except Exception as e:
-                    error_logger.error(f"Error adding temporary prefix to {pdf_path}: {e}")
+    # Collect the listing first so renamed files are not picked up again mid-scan
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(add_temporary_prefix, collect_pdf_paths(input_path)))
 
 
 def split_pdfs(input_path: str) -> None:
     """
     Splits multipage PDFs into individual pages.
 
+    Files are processed in parallel, one worker process per CPU core.
+
     Args:
         input_path (str): Path to the directory containing PDFs.
 
     Returns:
         None
     """
-    for root, _, files in os.walk(input_path):
-        for file in files:
-            pdf_path = os.path.join(root, file)
-            handle_pdf_splitting(pdf_path)
+    # Collect the listing first so the page files being written are not scanned too
+    map_in_workers(handle_pdf_splitting, collect_pdf_paths(input_path))
 
 
-def process_pdfs(input_path: str) -> None:
+def preload_dependencies() -> None:
     """
-    Extracts text from PDFs or applies OCR if text extraction fails.
+    Imports the PDF, OCR and matching libraries ahead of their first use.
+
+    Meant to run in a background thread while the user is still choosing what to process.
+
+    Returns:
+        None
+    """
+    import ocrmypdf  # noqa: F401
+    import pikepdf  # noqa: F401
+    import pypdfium2  # noqa: F401
+    import rapidfuzz.fuzz  # noqa: F401
+    import rapidfuzz.process  # noqa: F401
+    import unidecode  # noqa: F401
+
+
+def init_ocr_worker(log_queues: Dict, ocr_jobs: int = 1) -> None:
+    """
+    Sets how many pages each OCR run processes at once in a worker process and routes
+    its logs to the main process.
+
+    Tesseract itself is limited to a single thread, since parallelism is driven by the
+    worker pool and by ocrmypdf's page jobs; this avoids OpenMP oversubscription.
 
     Args:
-        input_path (str): Path to the directory containing PDFs.
+        log_queues (Dict): Queues of the application loggers, from `get_log_queues`.
+        ocr_jobs (int): Number of pages each OCR run processes in parallel.
 
     Returns:
         None
     """
-    for root, _, files in os.walk(input_path):
-        for file in files:
-            if file.endswith('.pdf'):
-                pdf_path = os.path.join(root, file)
-                extract_text_or_apply_ocr(pdf_path)
+    global _ocr_jobs
 
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _ocr_jobs = ocr_jobs
+    init_worker_logging(log_queues)
 
-def process_pdf_file(pdf_path: str, eps_config: Dict) -> Optional[Dict]:
+
+def map_in_workers(function: Callable, items: List) -> List:
+    """
+    Applies a function to every item in a pool of worker processes, one per CPU core.
+
+    With fewer items than cores, the spare cores are shared out as OCR page jobs, so
+    workers times OCR jobs stays close to the number of cores. On Windows, the pool is
+    capped at 61 workers, the most ProcessPoolExecutor supports there.
+
+    Args:
+        function (Callable): Picklable function to apply.
+        items (List): Items to process.
+
+    Returns:
+        List: The results, in the same order as the items.
+    """
+    if not items:
+        return []
+
+    cpu_count = os.cpu_count() or 1
+    max_workers = min(cpu_count, len(items))
+    if sys.platform == "win32":
+        max_workers = min(max_workers, _MAX_WINDOWS_WORKERS)
+    ocr_jobs = max(1, cpu_count // max_workers)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_ocr_worker,
+                             initargs=(get_log_queues(), ocr_jobs)) as executor:
+        return list(executor.map(function, items))
+
+
+def collect_pdf_paths(input_path: str) -> List[str]:
+    """
+    Collects the paths of all PDFs under a directory.
+
+    The listing is taken once up front, so stages can add, rename or remove files
+    while iterating it.
+
+    Args:
+        input_path (str): Path to the directory containing PDFs.
+
+    Returns:
+        List[str]: Paths to every PDF found in the directory tree.
+    """
+    return [entry.path for entry in scan_pdf_files(input_path)]
+
+
+def process_pdfs(input_path: str, eps_config: Optional[Dict] = None) -> Dict[str, Optional[str]]:
+    """
+    Extracts text from PDFs or applies OCR if text extraction fails.
+
+    Files are processed in parallel, one worker process per CPU core. When an EPS
+    configuration is given, each searchable PDF is also classified in the same worker,
+    so `combine_and_rename_pdfs` does not have to read it again. Finally, the cache is
+    pruned to its size and age limits.
+
+    Args:
+        input_path (str): Path to the directory containing PDFs.
+        eps_config (Optional[Dict]): Configuration dictionary containing file type mappings.
+
+    Returns:
+        Dict[str, Optional[str]]: Path of each searchable PDF mapped to its file type,
+        or to None when no configuration was given or classification failed.
+    """
+    eps_profile = normalize_eps_config(eps_config) if eps_config else None
+    process = partial(process_one_pdf, eps_profile=eps_profile, ocr=True, classify=eps_profile is not None)
+    results = map_in_workers(process, collect_pdf_paths(input_path))
+    prune_cache()
+    return {
+        pdf_path: file_type
+        for pdf_results in results
+        for pdf_path, _, file_type in pdf_results
+    }
+
+
+def process_pdf_file(pdf_path: str, eps_profile: EpsProfile) -> Optional[Dict]:
     """
     Processes a PDF file to extract relevant information like file type, invoice number, and patient ID.
 
     Args:
         pdf_path (str): Path to the PDF file.
-        eps_config (Dict): Configuration dictionary for file type mappings.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
 
     Returns:
         Optional[Dict]: Dictionary with 'file_type', 'invoice', and 'patient_id', or None if errors occur.
@@ -379,12 +1138,30 @@ def process_pdf_file(pdf_path: str, eps_config: Dict) -> Optional[Dict]:
         if not invoice:
             error_logger.error(f"No valid invoice number found in folder name {folder_name}. Skipping {pdf_path}.")
 
-        text = extract_text_from_pdf(pdf_path)
-
-        if not text:
-            error_logger.error(f"Failed to extract text from {pdf_path}. Skipping.")
-
-        file_type = process_text_for_file_type(text, eps_config)
+        # Classify page by page, keeping the exact keyword ranked first in the configuration
+        # across the whole document. Later pages only need to be searched for keywords ranked
+        # above the best one so far, and reading stops once the top-ranked keyword is found.
+        # The fuzzy fallback only runs over the whole text when no page matched exactly.
+        file_type = None
+        best_index = None
+        normalized_pages = []
+        for page_text in iter_pdf_text(pdf_path):
+            normalized_page = normalize_text(clean_text(page_text))
+            index = find_exact_keyword(normalized_page, eps_profile, best_index)
+            if index is not None:
+                best_index = index
+                if best_index == 0:
+                    break
+            normalized_pages.append(normalized_page)
+
+        if best_index is not None:
+            file_type = eps_profile.file_types[best_index]
+        else:
+            normalized_text = " ".join(normalized_pages)
+            if normalized_text.strip():
+                file_type = match_fuzzy_keyword(normalized_text, eps_profile)
+            else:
+                error_logger.error(f"Failed to extract text from {pdf_path}. Skipping.")
 
         if not file_type:
             error_logger.error(f"No valid keyword found in {pdf_path}. Skipping.")
@@ -395,56 +1172,296 @@ def process_pdf_file(pdf_path: str, eps_config: Dict) -> Optional[Dict]:
         error_logger.error(f"Error processing {pdf_path}: {e}")
 
 
-def combine_pdfs_by_type(file_type_to_pages: Dict[str, List[str]], eps_config: Dict, hospital_config: Dict) -> None:
+def classify_pdf_pages(pdf_path: str, eps_profile: EpsProfile,
+                       ocr: bool = False) -> List[Tuple[str, Optional[int], Optional[str]]]:
+    """
+    Determines the file type of each page of a PDF without splitting it into page files.
+
+    Pages are classified from the PDF's text in memory, and `combine_pdfs` later copies
+    them straight from the original, so no page is written to or read back from disk.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the keywords.
+        ocr (bool): Whether to apply OCR when some page has no text.
+
+    Returns:
+        List[Tuple[str, Optional[int], Optional[str]]]: The PDF path, a page index and the
+        file type of that page, for each page.
+    """
+    text = get_or_extract_text(pdf_path)
+
+    if ocr and (not text or not all(page_text.strip() for page_text in text.split(PAGE_SEPARATOR))):
+        searchable_path = apply_ocr(pdf_path)
+        if searchable_path:
+            info_logger.info("OCR applied")
+            pdf_path = searchable_path
+            text = get_or_extract_text(pdf_path)
+
+    if text is None:
+        error_logger.error(f"Failed to extract text from {pdf_path}. Skipping.")
+        return [(pdf_path, None, None)]
+
+    results = []
+    for page_index, page_text in enumerate(text.split(PAGE_SEPARATOR)):
+        file_type = process_text_for_file_type(page_text, eps_profile) if page_text.strip() else None
+        if not file_type:
+            error_logger.error(f"No valid keyword found in page {page_index + 1} of {pdf_path}. Skipping.")
+        results.append((pdf_path, page_index, file_type))
+    return results
+
+
+def combine_pdfs_by_type(file_type_to_pages: Dict[str, List[Tuple[str, Optional[int]]]], eps_profile: EpsProfile,
+                         hospital_config: Dict) -> None:
     """
     Combines PDF by type and renames the combined files.
 
+    A PDF that was classified page by page may feed several file types, and may already
+    have the final name of one of them. So every group is saved to a temporary file
+    first, and combined files are only moved into place, and sources removed, once all
+    groups have read their pages. A combined file never replaces a source that a failed
+    group still needs.
+
     Args:
         file_type_to_pages (Dict): Dictionary associating file types to their pages.
-        eps_config (Dict): Configuration dictionary for file type mappings.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the filename format.
         hospital_config (Dict): Hospital-specific configuration.
 
     Returns:
         None
     """
-    for file_type, related_pages in file_type_to_pages.items():
-        combined_path = os.path.join(os.path.dirname(related_pages[0]), f"combined_{file_type}.pdf")
-        combine_pdfs(related_pages, combined_path)
+    source_paths = {}
+    kept_paths = set()
+    combined_groups = []
 
-        invoice = extract_invoice_number(os.path.basename(os.path.dirname(related_pages[0])))
-        new_pdf_path = generate_new_file_path(related_pages[0], file_type, invoice, eps_config, hospital_config)
+    for file_type, related_pages in file_type_to_pages.items():
+        related_paths = [pdf_path for pdf_path, _ in related_pages]
+        source_paths.update(dict.fromkeys(related_paths))
+
+        # The temporary name does not end in .pdf, so it can never collide with a source
+        directory = os.path.dirname(related_paths[0])
+        combined_path = os.path.join(directory, f"combined_{file_type}.pdf.tmp")
+        if combine_pdfs(related_pages, combined_path):
+            combined_groups.append((file_type, related_paths, combined_path))
+        else:
+            kept_paths.update(related_paths)
+
+    written_paths = set()
+    for file_type, related_paths, combined_path in combined_groups:
+        directory = os.path.dirname(combined_path)
+        invoice = extract_invoice_number(os.path.basename(directory))
+        new_pdf_path = generate_new_file_path(related_paths[0], file_type, invoice, eps_profile, hospital_config)
 
         try:
-            os.rename(combined_path, new_pdf_path)
+            if new_pdf_path in kept_paths:
+                raise FileExistsError(f"{new_pdf_path} holds pages that were not combined")
+            # Replace any file that already has the final name, e.g. from a previous run,
+            # which os.rename refuses to do on Windows
+            os.replace(combined_path, new_pdf_path)
             info_logger.info(f"Renamed {combined_path} to {new_pdf_path}")
-        except Exception as e:
-            error_logger.error(f"Error renaming {combined_path}: {e}")
+            written_paths.add(new_pdf_path)
+        except OSError as e:
+            # Keep both the combined file and its sources: an earlier group may already
+            # have replaced one of those sources
+            error_logger.error(f"Error renaming {combined_path}, its pages were left there: {e}")
+            kept_paths.update(related_paths)
+
+    # Remove original files after combining
+    for pdf_path in source_paths:
+        remove_text_sidecar(pdf_path)
+        # A source that already had a final name was just replaced by the combined PDF
+        if pdf_path in kept_paths or pdf_path in written_paths:
+            continue
+        try:
+            os.remove(pdf_path)
+        except OSError as e:
+            error_logger.error(f"Error removing {pdf_path}: {e}")
+
+
+def combine_directory(file_type_to_pages: Dict[str, List[Tuple[str, Optional[int]]]], eps_profile: EpsProfile,
+                      hospital_config: Dict) -> None:
+    """
+    Combines and renames the PDFs of one directory, logging any unexpected error.
+
+    Args:
+        file_type_to_pages (Dict): Dictionary associating file types to their pages.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the filename format.
+        hospital_config (Dict): Hospital-specific configuration.
+
+    Returns:
+        None
+    """
+    try:
+        combine_pdfs_by_type(file_type_to_pages, eps_profile, hospital_config)
+    except Exception as e:
+        error_logger.error(f"Unexpected error: {e}")
 
 
-def combine_and_rename_pdfs(input_path: str, eps_config: Dict, hospital_config: Dict) -> None:
+def combine_classified_pdfs(classified_pdfs: Iterable[Tuple[str, Optional[int], Optional[str]]],
+                            eps_profile: EpsProfile, hospital_config: Dict) -> None:
+    """
+    Groups classified PDFs by directory and file type, then combines and renames each group.
+
+    Args:
+        classified_pdfs (Iterable[Tuple[str, Optional[int], Optional[str]]]): PDF paths paired
+            with a page index, or None for the whole PDF, and its file type.
+        eps_profile (EpsProfile): Normalized EPS configuration holding the filename format.
+        hospital_config (Dict): Hospital-specific configuration.
+
+    Returns:
+        None
+    """
+    directory_to_types = {}
+    for pdf_path, page_index, file_type in classified_pdfs:
+        file_type_to_pages = directory_to_types.setdefault(os.path.dirname(pdf_path), {})
+        file_type_to_pages.setdefault(file_type, []).append((pdf_path, page_index))
+
+    combine = partial(combine_directory, eps_profile=eps_profile, hospital_config=hospital_config)
+    directories = list(directory_to_types.values())
+
+    # Directories are independent, so combining them in workers overlaps their disk reads
+    # and writes; a single directory is not worth starting the pool for
+    if len(directories) > 1:
+        map_in_workers(combine, directories)
+    else:
+        for file_type_to_pages in directories:
+            combine(file_type_to_pages)
+
+
+def combine_and_rename_pdfs(input_path: str, eps_config: Dict, hospital_config: Dict,
+                            classifications: Optional[Dict[str, Optional[str]]] = None) -> None:
     """
     Combines PDFs by type and renames the combined files.
 
+    PDFs without a known classification are classified in parallel, one worker process
+    per CPU core; combining happens afterwards in this process. Finally, the cache is
+    pruned to its size and age limits.
+
     Args:
         input_path (str): Path to the input directory or file.
         eps_config (Dict): Configuration dictionary containing file type mappings.
         hospital_config (Dict): Hospital-specific configuration.
+        classifications (Optional[Dict[str, Optional[str]]]): File types already determined,
+            e.g. by `process_pdfs`, keyed by PDF path. These PDFs are not read again.
 
     Returns:
         None
     """
+    eps_profile = normalize_eps_config(eps_config)
+    file_types = {
+        pdf_path: file_type
+        for pdf_path, file_type in (classifications or {}).items()
+        if file_type is not None
+    }
+
     try:
-        for root, _, files in os.walk(input_path):
-            file_type_to_pages = {}
-            for file in files:
-                pdf_path = os.path.join(root, file)
-                result = process_pdf_file(pdf_path, eps_config)
+        pdf_paths = collect_pdf_paths(input_path)
+        pending_paths = [pdf_path for pdf_path in pdf_paths if pdf_path not in file_types]
+        results = map_in_workers(partial(process_pdf_file, eps_profile=eps_profile), pending_paths)
 
-                if result:
-                    file_type_to_pages.setdefault(result['file_type'], []).append(pdf_path)
+        for pdf_path, result in zip(pending_paths, results):
+            if result:
+                file_types[pdf_path] = result['file_type']
 
-            if file_type_to_pages:
-                combine_pdfs_by_type(file_type_to_pages, eps_config, hospital_config)
+        combine_classified_pdfs(
+            ((pdf_path, None, file_types[pdf_path]) for pdf_path in pdf_paths if pdf_path in file_types),
+            eps_profile,
+            hospital_config,
+        )
 
     except Exception as e:
         error_logger.error(f"Unexpected error: {e}")
+
+    prune_cache()
+
+
+def process_one_pdf(pdf_path: str, eps_profile: Optional[EpsProfile], rename: bool = False, split: bool = False,
+                    ocr: bool = False, classify: bool = False) -> List[Tuple[str, Optional[int], Optional[str]]]:
+    """
+    Runs the selected per-file stages (rename, split, OCR, classify) on a single PDF.
+
+    When splitting and classifying together, pages are classified in memory instead of
+    being written to separate files first.
+
+    Args:
+        pdf_path (str): Path to the PDF file.
+        eps_profile (Optional[EpsProfile]): Normalized EPS configuration holding the keywords.
+            Only needed when classifying.
+        rename (bool): Whether to add the temporary prefix.
+        split (bool): Whether to split the PDF into individual pages.
+        ocr (bool): Whether to extract text or apply OCR.
+        classify (bool): Whether to determine the file type of each resulting PDF.
+
+    Returns:
+        List[Tuple[str, Optional[int], Optional[str]]]: Each resulting PDF path paired with a
+        page index, or None for the whole PDF, and its file type, or None when classification
+        was not requested or failed.
+    """
+    if rename:
+        pdf_path = add_temporary_prefix(pdf_path)
+
+    if split and classify:
+        return classify_pdf_pages(pdf_path, eps_profile, ocr)
+
+    pdf_paths = handle_pdf_splitting(pdf_path) if split else [pdf_path]
+
+    if ocr:
+        pdf_paths = [extract_text_or_apply_ocr(path) for path in pdf_paths]
+
+    results = []
+    for path in pdf_paths:
+        file_type = None
+        if classify:
+            result = process_pdf_file(path, eps_profile)
+            file_type = result['file_type'] if result else None
+        # Only PDFs about to be combined need their sidecar; the text stays in the content cache
+        if file_type is None:
+            remove_text_sidecar(path)
+        results.append((path, None, file_type))
+    return results
+
+
+def run_pipeline(input_path: str, eps_config: Dict, hospital_config: Dict, rename: bool = False,
+                 split: bool = False, ocr: bool = False, combine: bool = False) -> None:
+    """
+    Runs the selected stages over a directory with a single traversal.
+
+    Each PDF goes through rename, split, OCR and classification in one worker, so its
+    bytes are read while still in the page cache. Classified pages are then combined
+    and renamed per directory. Finally, the cache is pruned to its size and age limits.
+
+    Args:
+        input_path (str): Path to the directory containing PDFs.
+        eps_config (Dict): Configuration dictionary containing file type mappings.
+        hospital_config (Dict): Hospital-specific configuration.
+        rename (bool): Whether to add the temporary prefix.
+        split (bool): Whether to split PDFs into individual pages.
+        ocr (bool): Whether to extract text or apply OCR.
+        combine (bool): Whether to combine and rename PDFs by type.
+
+    Returns:
+        None
+    """
+    pdf_paths = collect_pdf_paths(input_path)
+    if not pdf_paths:
+        return
+
+    eps_profile = normalize_eps_config(eps_config)
+    process = partial(process_one_pdf, eps_profile=eps_profile, rename=rename, split=split,
+                      ocr=ocr, classify=combine)
+
+    if split or ocr or combine:
+        results = map_in_workers(process, pdf_paths)
+    else:
+        # Renaming alone is not worth starting processes for, but the renames can overlap
+        with ThreadPoolExecutor() as executor:
+            results = list(executor.map(process, pdf_paths))
+
+    if combine:
+        combine_classified_pdfs(
+            (classified_pdf for pdf_results in results for classified_pdf in pdf_results),
+            eps_profile,
+            hospital_config,
+        )
+
+    prune_cache()
@@ -1,12 +1,54 @@
+import atexit
 import logging
+import multiprocessing
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+# File handler of each application logger, and the queue worker processes log into, by logger name
+_file_handlers = {}
+_worker_queues = {}
+
+
+def _start_listener(log_queue, handler):
+    """Starts a background thread that writes the records put on a queue to a handler."""
+    listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    # Flush pending records before the interpreter exits
+    atexit.register(listener.stop)
+
 
 def setup_logging():
-    """Sets up logging for the application."""
-    logging.basicConfig(level=logging.INFO)
+    """
+    Sets up logging for the application.
 
+    Log files are written by a background thread: each logger only puts its records on
+    a queue, which a QueueListener drains into the file. Worker processes log into their
+    own queues (see `get_log_queues`), so they never contend for the log files either.
+
+    Calling it again returns the same loggers without adding handlers, so every record
+    is written once.
+
+    Only the main process, identified by the name "MainProcess", gets the file handlers.
+    In any other process the loggers are returned without handlers, and their records
+    are dropped until `init_worker_logging` routes them to the main process. Worker pools
+    must therefore pass `init_worker_logging` as their initializer, and the main process
+    must not be renamed.
+    """
     info_logger = logging.getLogger("info_logger")
     error_logger = logging.getLogger("error_logger")
 
+    # Records only go to the log files, not through the root logger as well
+    info_logger.setLevel(logging.INFO)
+    error_logger.setLevel(logging.ERROR)
+    info_logger.propagate = False
+    error_logger.propagate = False
+
+    # Spawned workers import this module too, before any initializer runs, so they are told
+    # apart by name: multiprocessing names them in the child before importing the main module.
+    # Their records only reach the log files once init_worker_logging has been called.
+    if _file_handlers or multiprocessing.current_process().name != "MainProcess":
+        return info_logger, error_logger
+
     # Handlers
     info_handler = logging.FileHandler("info.log")
     error_handler = logging.FileHandler("error.log")
@@ -21,7 +63,39 @@ def setup_logging():
     info_handler.setLevel(logging.INFO)
     error_handler.setLevel(logging.ERROR)
 
-    info_logger.addHandler(info_handler)
-    error_logger.addHandler(error_handler)
+    for logger, handler in ((info_logger, info_handler), (error_logger, error_handler)):
+        log_queue = queue.SimpleQueue()
+        _start_listener(log_queue, handler)
+        logger.addHandler(QueueHandler(log_queue))
+        _file_handlers[logger.name] = handler
 
     return info_logger, error_logger
+
+
+def get_log_queues():
+    """
+    Returns the queues through which worker processes write to the application log files.
+
+    The queues are created on first use, so importing the application does not fix the
+    multiprocessing start method.
+    """
+    for name, handler in _file_handlers.items():
+        if name not in _worker_queues:
+            log_queue = multiprocessing.Queue(-1)
+            _start_listener(log_queue, handler)
+            _worker_queues[name] = log_queue
+    return dict(_worker_queues)
+
+
+def init_worker_logging(log_queues):
+    """
+    Sends the records of the application loggers in a worker process to the main process.
+
+    Must be called in every child process that logs, typically as the pool initializer,
+    since `setup_logging` installs no handlers outside the main process.
+    """
+    for name, log_queue in log_queues.items():
+        logger = logging.getLogger(name)
+        for handler in list(logger.handlers):
+            logger.removeHandler(handler)
+        logger.addHandler(QueueHandler(log_queue))